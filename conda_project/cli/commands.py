@@ -4,10 +4,10 @@
 import sys
 from argparse import Namespace
 from functools import wraps
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
 from ..exceptions import CondaProjectError
-from ..project import CondaProject
+from ..project import CondaProject, Environment
 
 
 def handle_errors(func: Callable[[Namespace], Any]) -> Callable[[Namespace], int]:
@@ -35,7 +35,7 @@ def create(args: Namespace) -> bool:
         args.name,
         args.dependencies,
         args.channel,
-        args.platforms.split(","),
+        None if args.platforms is None else args.platforms.split(","),
         [] if args.conda_configs is None else args.conda_configs.split(","),
         not args.no_lock,
         verbose=True,
@@ -51,6 +51,7 @@ def create(args: Namespace) -> bool:
 def lock(args: Namespace) -> bool:
     project = CondaProject(args.directory)
 
+    to_lock: Iterable[Environment]
     if args.environment:
         to_lock = [project.environments[args.environment]]
     else:
@@ -73,7 +74,7 @@ def prepare(args: Namespace) -> bool:
     project = CondaProject(args.directory)
 
     if args.all:
-        for _, env in project.environments:
+        for env in project.environments.values():
             env.prepare(force=args.force, verbose=True)
     else:
         env = (
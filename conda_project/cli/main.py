@@ -8,7 +8,6 @@ from argparse import ArgumentParser
 
 from conda_project import __version__
 
-from ..project import DEFAULT_PLATFORMS
 from . import commands
 
 if typing.TYPE_CHECKING:
@@ -80,11 +79,11 @@ def _create_create_parser(
     p.add_argument(
         "--platforms",
         help=(
-            f"Comma separated list of platforms for which to lock dependencies. "
-            f"The default is {','.join(DEFAULT_PLATFORMS)}"
+            "Comma separated list of platforms for which to lock dependencies. "
+            "The default is osx-64,linux-64,win-64 and your current platform."
         ),
         action="store",
-        default=",".join(DEFAULT_PLATFORMS),
+        default=None,
     )
     p.add_argument(
         "--conda-configs",
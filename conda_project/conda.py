@@ -3,16 +3,19 @@
 # SPDX-License-Identifier: BSD-3-Clause
 from __future__ import annotations
 
-import json
 import os
 import subprocess
+import tempfile
+from functools import lru_cache
 from logging import Logger
 from pathlib import Path
 from typing import List, Optional
 
 from .exceptions import CondaProjectError
+from .utils import json_loads
 
 CONDA_EXE = os.environ.get("CONDA_EXE", "conda")
+UNKNOWN_CHANNEL = "<unknown>"
 
 
 def call_conda(
@@ -21,11 +24,12 @@ def call_conda(
     verbose: bool = False,
     logger: Optional[Logger] = None,
 ) -> subprocess.CompletedProcess:
-    env = os.environ.copy()
+    # env=None lets the subprocess inherit os.environ without copying it
+    env = None
     if condarc_path is not None:
         if logger is not None:
             logger.info(f"setting CONDARC env variable to {condarc_path}")
-        env["CONDARC"] = str(condarc_path)
+        env = {**os.environ, "CONDARC": str(condarc_path)}
 
     cmd = [CONDA_EXE] + args
 
@@ -36,23 +40,47 @@ def call_conda(
 
     if logger is not None:
         logger.info(f'running conda command: {" ".join(cmd)}')
-    proc = subprocess.run(
-        cmd, env=env, stdout=stdout, stderr=subprocess.PIPE, encoding="utf-8"
-    )
+    # stderr is spooled to a temporary file rather than a pipe so that
+    # it is only read back into memory if the command fails.
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as stderr:
+        proc = subprocess.run(
+            cmd, env=env, stdout=stdout, stderr=stderr, encoding="utf-8"
+        )
 
-    if proc.returncode != 0:
-        print_cmd = " ".join(cmd)
-        raise CondaProjectError(f"Failed to run:\n  {print_cmd}\n{proc.stderr.strip()}")
+        if proc.returncode != 0:
+            stderr.seek(0)
+            print_cmd = " ".join(cmd)
+            raise CondaProjectError(
+                f"Failed to run:\n  {print_cmd}\n{stderr.read().strip()}"
+            )
 
     return proc
 
 
+@lru_cache(maxsize=1)
 def conda_info():
     proc = call_conda(["info", "--json"])
-    parsed = json.loads(proc.stdout)
+    parsed = json_loads(proc.stdout)
     return parsed
 
 
 def current_platform():
     info = conda_info()
     return info.get("platform")
+
+
+def installed_package_urls(prefix: Path) -> List[str]:
+    """Return the URLs of the conda packages installed in a prefix.
+
+    The package records in <prefix>/conda-meta are read directly rather
+    than running `conda list --explicit`. Records without a known URL
+    are skipped. The order of the returned list is not meaningful.
+
+    """
+    urls = []
+    for record_file in (prefix / "conda-meta").glob("*.json"):
+        record = json_loads(record_file.read_bytes())
+        url = record.get("url")
+        if url and not url.startswith(UNKNOWN_CHANNEL):
+            urls.append(url)
+    return urls
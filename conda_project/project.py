@@ -3,48 +3,109 @@
 # SPDX-License-Identifier: BSD-3-Clause
 from __future__ import annotations
 
-import json
 import logging
 import os
 import shutil
 import sys
 import tempfile
 import warnings
-from collections import OrderedDict
 from contextlib import nullcontext, redirect_stderr
+from functools import lru_cache
 from io import StringIO
 from pathlib import Path
 from subprocess import SubprocessError
-from typing import List, Optional, Tuple, Union
-
-from conda_lock.conda_lock import (
-    default_virtual_package_repodata,
-    make_lock_files,
-    make_lock_spec,
-    parse_conda_lock_file,
-    render_lockfile_for_platform,
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
 )
-from pydantic import BaseModel, create_model
 
-from .conda import CONDA_EXE, call_conda, current_platform
+from pydantic import BaseModel
+
+from .conda import CONDA_EXE, call_conda, current_platform, installed_package_urls
 from .exceptions import CondaProjectError
 from .project_file import (
     ENVIRONMENT_YAML_FILENAMES,
     PROJECT_YAML_FILENAMES,
     CondaProjectYaml,
     EnvironmentYaml,
-    yaml,
+    get_yaml,
 )
-from .utils import Spinner, env_variable, find_file
+from .utils import Spinner, env_variable, find_file, json_loads, list_files
 
-_TEMPFILE_DELETE = False if sys.platform.startswith("win") else True
+if TYPE_CHECKING:
+    from conda_lock.src_parser import Lockfile
+    from conda_lock.virtual_package import FakeRepoData
 
-DEFAULT_PLATFORMS = set(["osx-64", "win-64", "linux-64", current_platform()])
+_TEMPFILE_DELETE = False if sys.platform.startswith("win") else True
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=os.environ.get("CONDA_PROJECT_LOGLEVEL", "WARNING"))
 
 
+@lru_cache(maxsize=1)
+def default_platforms() -> Tuple[str, ...]:
+    """The platforms to lock for when none are specified.
+
+    These are osx-64, win-64, linux-64 and the current platform. They are
+    computed on first use so that importing conda_project does not need
+    to run `conda info`.
+
+    """
+    return tuple(dict.fromkeys(["osx-64", "win-64", "linux-64", current_platform()]))
+
+
+def __getattr__(name: str) -> Any:
+    # DEFAULT_PLATFORMS is kept for backwards compatibility and is only
+    # computed when it is accessed.
+    if name == "DEFAULT_PLATFORMS":
+        return set(default_platforms())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _file_key(fn: Path) -> Tuple[str, int, int]:
+    """Return a cache key for fn that changes whenever the file is modified."""
+    stat = fn.stat()
+    return str(fn), stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=128)
+def _parse_conda_lock_file(path: str, mtime_ns: int, size: int) -> Lockfile:
+    from conda_lock.conda_lock import parse_conda_lock_file
+
+    return parse_conda_lock_file(Path(path))
+
+
+@lru_cache(maxsize=128)
+def _render_explicit_lockfile(
+    path: str, mtime_ns: int, size: int, platform: str
+) -> Tuple[str, ...]:
+    from conda_lock.conda_lock import render_lockfile_for_platform
+
+    lock = _parse_conda_lock_file(path, mtime_ns, size)
+    rendered = render_lockfile_for_platform(
+        lockfile=lock,
+        platform=platform,
+        kind="explicit",
+        include_dev_dependencies=False,
+        extras=None,
+    )
+    return tuple(rendered)
+
+
+@lru_cache(maxsize=1)
+def _default_virtual_package_repodata() -> FakeRepoData:
+    from conda_lock.conda_lock import default_virtual_package_repodata
+
+    return default_virtual_package_repodata()
+
+
 class Environment(BaseModel):
     name: str
     sources: Tuple[Path, ...]
@@ -77,33 +138,38 @@ class Environment(BaseModel):
 
         platform_overrides = None
         if not specified_platforms:
-            platform_overrides = list(DEFAULT_PLATFORMS)
+            platform_overrides = list(default_platforms())
 
-        return channel_overrides, platform_overrides
+        return channel_overrides, platform_overrides, specified_channels
 
     @property
     def is_locked(self) -> bool:
         """
         bool: Returns True if the lockfile is consistent with the source files, False otherwise.
         """
-        channel_overrides, platform_overrides = self._overrides
-        if self.lockfile.exists():
-            lock = parse_conda_lock_file(self.lockfile)
-            spec = make_lock_spec(
-                src_files=list(self.sources),
-                channel_overrides=channel_overrides,
-                platform_overrides=platform_overrides,
-                virtual_package_repo=default_virtual_package_repodata(),
-            )
-            all_up_to_date = all(
-                p in lock.metadata.platforms
-                and spec.content_hash_for_platform(p) == lock.metadata.content_hash[p]
-                for p in spec.platforms
-            )
-            return all_up_to_date
-        else:
+        from conda_lock.conda_lock import make_lock_spec
+
+        # The stat for the cache key also tells whether the lockfile exists.
+        try:
+            lockfile_key = _file_key(self.lockfile)
+        except FileNotFoundError:
             return False
 
+        channel_overrides, platform_overrides, _ = self._overrides
+        lock = _parse_conda_lock_file(*lockfile_key)
+        spec = make_lock_spec(
+            src_files=list(self.sources),
+            channel_overrides=channel_overrides,
+            platform_overrides=platform_overrides,
+            virtual_package_repo=_default_virtual_package_repodata(),
+        )
+        all_up_to_date = all(
+            p in lock.metadata.platforms
+            and spec.content_hash_for_platform(p) == lock.metadata.content_hash[p]
+            for p in spec.platforms
+        )
+        return all_up_to_date
+
     @property
     def is_prepared(self) -> bool:
         """
@@ -113,24 +179,23 @@ class Environment(BaseModel):
         """
         if (self.prefix / "conda-meta" / "history").exists():
             if self.is_locked:
-                installed_pkgs = call_conda(
-                    ["list", "-p", str(self.prefix), "--explicit"]
-                ).stdout.splitlines()[3:]
-
-                lock = parse_conda_lock_file(self.lockfile)
-                rendered = render_lockfile_for_platform(
-                    lockfile=lock,
-                    platform=current_platform(),
-                    kind="explicit",
-                    include_dev_dependencies=False,
-                    extras=None,
-                )
-                locked_pkgs = [p.split("#")[0] for p in rendered[3:]]
-
-                return installed_pkgs == locked_pkgs
+                return self._matches_lockfile()
 
         return False
 
+    def _matches_lockfile(self) -> bool:
+        """Return True if the packages in the prefix are those in the lockfile."""
+        installed_pkgs = installed_package_urls(self.prefix)
+
+        rendered = _render_explicit_lockfile(
+            *_file_key(self.lockfile), current_platform()
+        )
+        locked_pkgs = {
+            p.split("#")[0] for p in rendered if not p.startswith(("#", "@"))
+        }
+
+        return set(installed_pkgs) == locked_pkgs
+
     def lock(
         self,
         force: bool = False,
@@ -146,6 +211,8 @@ class Environment(BaseModel):
             verbose:     A verbose flag passed into the `conda lock` command.
 
         """
+        from conda_lock.conda_lock import make_lock_files
+
         if self.is_locked and not force:
             if verbose:
                 print(
@@ -160,18 +227,15 @@ class Environment(BaseModel):
         # the hash in the lockfile but does not remove the unspecified
         # package (and necessary orphaned dependencies) from the lockfile.
         # To avoid this scenario lockfiles are written to a temporary location
-        # and copied back to the self.lockfile path if successful.
-        tempdir = Path(tempfile.mkdtemp())
+        # and moved to the self.lockfile path if successful. The temporary
+        # directory is created next to the lockfile so that the move is an
+        # atomic rename on the same filesystem.
+        tempdir = Path(
+            tempfile.mkdtemp(prefix=f".{self.lockfile.name}.", dir=self.lockfile.parent)
+        )
         lockfile = tempdir / self.lockfile.name
 
-        channel_overrides, platform_overrides = self._overrides
-
-        specified_channels = []
-        for fn in self.sources:
-            env = EnvironmentYaml.parse_yaml(fn)
-            for channel in env.channels or []:
-                if channel not in specified_channels:
-                    specified_channels.append(channel)
+        channel_overrides, platform_overrides, specified_channels = self._overrides
 
         with redirect_stderr(StringIO()) as _:
             with env_variable("CONDARC", str(self.condarc)):
@@ -190,9 +254,9 @@ class Environment(BaseModel):
                             platform_overrides=platform_overrides,
                             channel_overrides=channel_overrides,
                         )
-                        shutil.copy(lockfile, self.lockfile)
+                        os.replace(lockfile, self.lockfile)
                     except SubprocessError as e:
-                        output = json.loads(e.output)
+                        output = json_loads(e.output)
                         msg = output["message"].replace(
                             "target environment",
                             f"supplied channels: {channel_overrides or specified_channels}",
@@ -202,7 +266,7 @@ class Environment(BaseModel):
                     finally:
                         shutil.rmtree(tempdir)
 
-        lock = parse_conda_lock_file(self.lockfile)
+        lock = _parse_conda_lock_file(*_file_key(self.lockfile))
         msg = f"Locked dependencies for {', '.join(lock.metadata.platforms)} platforms"
         logger.info(msg)
 
@@ -233,7 +297,10 @@ class Environment(BaseModel):
                 print(f"The lockfile {self.lockfile} is out-of-date, re-locking...")
             self.lock(verbose=verbose)
 
-        if self.is_prepared:
+        # The lockfile is up-to-date at this point so there is no need to go
+        # through is_prepared, which would check is_locked again.
+        history_exists = (self.prefix / "conda-meta" / "history").exists()
+        if history_exists and self._matches_lockfile():
             if not force:
                 logger.info(f"environment already exists at {self.prefix}")
                 if verbose:
@@ -242,7 +309,7 @@ class Environment(BaseModel):
                         f"run 'conda project prepare --force {self.name} to recreate it from the locked dependencies."
                     )
                 return self.prefix
-        elif (self.prefix / "conda-meta" / "history").exists() and not self.is_prepared:
+        elif history_exists:
             if not force:
                 if verbose:
                     print(
@@ -252,7 +319,7 @@ class Environment(BaseModel):
                     )
                 return self.prefix
 
-        lock = parse_conda_lock_file(self.lockfile)
+        lock = _parse_conda_lock_file(*_file_key(self.lockfile))
         if current_platform() not in lock.metadata.platforms:
             msg = (
                 f"Your current platform, {current_platform()}, is not in the supported locked platforms.\n"
@@ -260,12 +327,8 @@ class Environment(BaseModel):
             )
             raise CondaProjectError(msg)
 
-        rendered = render_lockfile_for_platform(
-            lockfile=lock,
-            platform=current_platform(),
-            kind="explicit",
-            include_dev_dependencies=False,
-            extras=None,
+        rendered = _render_explicit_lockfile(
+            *_file_key(self.lockfile), current_platform()
         )
 
         with tempfile.NamedTemporaryFile(mode="w", delete=_TEMPFILE_DELETE) as f:
@@ -309,18 +372,37 @@ class Environment(BaseModel):
         )
 
 
-class BaseEnvironments(BaseModel):
+class Environments(Mapping[str, Environment]):
+    """A read-only mapping of environment names to Environment objects.
+
+    Environments can also be accessed as attributes.
+
+    """
+
+    _envs: Dict[str, Environment]
+
+    def __init__(self, envs: Dict[str, Environment]):
+        object.__setattr__(self, "_envs", envs)
+
     def __getitem__(self, key: str) -> Environment:
-        return getattr(self, key)
+        return self._envs[key]
 
-    def keys(self):
-        return self.__dict__.keys()
+    def __getattr__(self, key: str) -> Environment:
+        if key.startswith("_"):
+            raise AttributeError(key)
+        try:
+            return self._envs[key]
+        except KeyError:
+            raise AttributeError(key)
 
-    def values(self):
-        return self.__dict__.values()
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise TypeError(f'"{type(self).__name__}" is immutable')
 
-    class Config:
-        allow_mutation = False
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._envs)
+
+    def __len__(self) -> int:
+        return len(self._envs)
 
 
 class CondaProject:
@@ -344,7 +426,10 @@ class CondaProject:
         self.directory = Path(directory).resolve()
         logger.info(f"created Project instance at {self.directory}")
 
-        self.project_yaml_path = find_file(self.directory, PROJECT_YAML_FILENAMES)
+        filenames = list_files(self.directory)
+        self.project_yaml_path = find_file(
+            self.directory, PROJECT_YAML_FILENAMES, filenames
+        )
         if self.project_yaml_path is not None:
             self._project_file = CondaProjectYaml.parse_yaml(self.project_yaml_path)
         else:
@@ -354,7 +439,7 @@ class CondaProject:
             )
 
             environment_yaml_path = find_file(
-                self.directory, ENVIRONMENT_YAML_FILENAMES
+                self.directory, ENVIRONMENT_YAML_FILENAMES, filenames
             )
             if environment_yaml_path is None:
                 options = " or ".join(ENVIRONMENT_YAML_FILENAMES)
@@ -362,12 +447,13 @@ class CondaProject:
 
             self._project_file = CondaProjectYaml(
                 name=self.directory.name,
-                environments=OrderedDict(
-                    [("default", [environment_yaml_path.relative_to(self.directory)])]
-                ),
+                environments={
+                    "default": [environment_yaml_path.relative_to(self.directory)]
+                },
             )
 
         self.condarc = self.directory / ".condarc"
+        self._environments: Optional[Environments] = None
 
     @classmethod
     def create(
@@ -425,29 +511,34 @@ class CondaProject:
         if name is None:
             name = directory.name
 
+        # Only the first = separates the key so values may contain =.
+        condarc = {}
+        for config in conda_configs or []:
+            key, sep, value = config.partition("=")
+            if not sep:
+                raise CondaProjectError(
+                    f"The Conda configuration {config} must be in the format key=value."
+                )
+            condarc[key] = value
+
         environment_yaml = EnvironmentYaml(
             channels=channels or ["defaults"],
             dependencies=dependencies or [],
-            platforms=platforms or list(DEFAULT_PLATFORMS),
+            platforms=platforms or list(default_platforms()),
         )
 
-        environment_yaml_path = directory / "environment.yml"
-        environment_yaml.yaml(directory / "environment.yml")
+        # The sources in conda-project.yml are relative to the project directory.
+        environment_yaml_path = Path("environment.yml")
+        environment_yaml.yaml(directory / environment_yaml_path)
 
         project_yaml = CondaProjectYaml(
             name=name,
-            environments=OrderedDict(
-                [("default", [environment_yaml_path.relative_to(directory)])]
-            ),
+            environments={"default": [environment_yaml_path]},
         )
 
         project_yaml.yaml(directory / "conda-project.yml")
 
-        condarc = {}
-        for config in conda_configs or []:
-            k, v = config.split("=")
-            condarc[k] = v
-        yaml.dump(condarc, directory / ".condarc")
+        get_yaml().dump(condarc, directory / ".condarc")
 
         project = cls(directory)
 
@@ -460,22 +551,24 @@ class CondaProject:
         return project
 
     @property
-    def environments(self) -> BaseEnvironments:
-        envs = OrderedDict()
-        for env_name, sources in self._project_file.environments.items():
-            envs[env_name] = Environment(
-                name=env_name,
-                sources=[self.directory / str(s) for s in sources],
-                prefix=self.directory / "envs" / env_name,
-                lockfile=self.directory / f"{env_name}.conda-lock.yml",
-                condarc=self.condarc,
+    def environments(self) -> Environments:
+        # The environments are built once per instance since the project
+        # file is only read when the CondaProject is created.
+        if self._environments is None:
+            envs_dir = self.directory / "envs"
+            self._environments = Environments(
+                {
+                    env_name: Environment(
+                        name=env_name,
+                        sources=[self.directory / s for s in sources],
+                        prefix=envs_dir / env_name,
+                        lockfile=self.directory / f"{env_name}.conda-lock.yml",
+                        condarc=self.condarc,
+                    )
+                    for env_name, sources in self._project_file.environments.items()
+                }
             )
-        Environments = create_model(
-            "Environments",
-            **{k: (Environment, ...) for k in envs},
-            __base__=BaseEnvironments,
-        )
-        return Environments(**envs)
+        return self._environments
 
     @property
     def default_environment(self) -> Environment:
@@ -493,28 +586,28 @@ class CondaProject:
                      False if any environment is not locked or out-of-date.
 
         """
-        return_status = []
+        # Without verbose output the first failing environment decides the
+        # result, so the remaining lockfiles are not read.
+        status = True
 
         for env in self.environments.values():
             if not env.lockfile.exists():
-                if verbose:
-                    print(f"The environment {env.name} is not locked.", file=sys.stderr)
-                    print(
-                        f"Run 'conda project lock {env.name}' to create.",
-                        file=sys.stderr,
-                    )
-                return_status.append(False)
+                if not verbose:
+                    return False
+                print(f"The environment {env.name} is not locked.", file=sys.stderr)
+                print(
+                    f"Run 'conda project lock {env.name}' to create.",
+                    file=sys.stderr,
+                )
+                status = False
             elif not env.is_locked:
-                if verbose:
-                    print(
-                        f"The lockfile for environment {env.name} is out-of-date.",
-                        file=sys.stderr,
-                    )
-                    print(
-                        f"Run 'conda project lock {env.name}' to fix.", file=sys.stderr
-                    )
-                return_status.append(False)
-            else:
-                return_status.append(True)
+                if not verbose:
+                    return False
+                print(
+                    f"The lockfile for environment {env.name} is out-of-date.",
+                    file=sys.stderr,
+                )
+                print(f"Run 'conda project lock {env.name}' to fix.", file=sys.stderr)
+                status = False
 
-        return all(return_status)
+        return status
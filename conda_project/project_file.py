@@ -1,39 +1,134 @@
 # Copyright (C) 2022 Anaconda, Inc
 # SPDX-License-Identifier: BSD-3-Clause
 
-import json
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, OrderedDict, TextIO, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Dict,
+    List,
+    Optional,
+    TextIO,
+    Type,
+    Union,
+)
 
 from pydantic import BaseModel, ValidationError, validator
-from ruamel.yaml import YAML
 
 from .exceptions import CondaProjectError
 
+if TYPE_CHECKING:
+    from ruamel.yaml import YAML
+
 PROJECT_YAML_FILENAMES = ("conda-project.yml", "conda-project.yaml")
 ENVIRONMENT_YAML_FILENAMES = ("environment.yml", "environment.yaml")
 
-yaml = YAML(typ="rt")
-yaml.default_flow_style = False
-yaml.block_seq_indent = 2
-yaml.indent = 2
 
+@lru_cache(maxsize=1)
+def get_yaml() -> "YAML":
+    """Return the round-trip ruamel.yaml instance used to write YAML files.
+
+    ruamel.yaml is imported on first use rather than when this module is
+    imported.
+
+    """
+    from ruamel.yaml import YAML
+
+    yaml = YAML(typ="rt")
+    yaml.default_flow_style = False
+    yaml.block_seq_indent = 2
+    yaml.indent = 2
+    return yaml
+
+
+@lru_cache(maxsize=1)
+def get_safe_yaml() -> "YAML":
+    """Return the ruamel.yaml instance used to read YAML files.
+
+    The safe loader builds plain Python objects instead of the round-trip
+    types and keeps the YAML 1.2 rules and duplicate key checks of ruamel.
+    It parses with the libyaml-based CParser from ruamel.yaml.clib, which
+    is a dependency. Without it ruamel falls back to its pure Python parser.
+
+    """
+    from ruamel.yaml import YAML
+
+    return YAML(typ="safe")
+
+
+def __getattr__(name: str) -> Any:
+    # The module-level yaml writer is kept for backwards compatibility and
+    # is only created when it is accessed.
+    if name == "yaml":
+        return get_yaml()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def _cleandict(d: Dict) -> Dict:
-    return {k: v for k, v in d.items() if v is not None}
+
+def _to_primitive(obj: Any, exclude_none: bool = False) -> Any:
+    """Convert the output of BaseModel.dict() into plain YAML types.
+
+    Paths are written as POSIX strings, tuples as lists and mappings as
+    plain dicts. With exclude_none keys with None values are dropped at
+    every level, including inside dict fields.
+
+    """
+    if isinstance(obj, dict):
+        return {
+            k: _to_primitive(v, exclude_none)
+            for k, v in obj.items()
+            if not (exclude_none and v is None)
+        }
+    elif isinstance(obj, (list, tuple)):
+        return [_to_primitive(v, exclude_none) for v in obj]
+    elif isinstance(obj, Path):
+        return obj.as_posix()
+    else:
+        return obj
+
+
+@lru_cache(maxsize=128)
+def _parse_file(
+    cls: Type["BaseYaml"], path: str, mtime_ns: int, size: int
+) -> "BaseYaml":
+    """Parse a YAML file as cls.
+
+    The modification time and size are part of the cache key so that the
+    file is parsed again when it changes.
+
+    """
+    # The file is opened in binary mode so that ruamel.yaml detects the
+    # encoding, UTF-8 by default, rather than using the locale encoding.
+    with open(path, "rb") as f:
+        return cls._from_yaml(f, path)
 
 
 class BaseYaml(BaseModel):
+    def dict(self, **kwargs: Any) -> Dict[str, Any]:  # type: ignore[override]
+        return _to_primitive(super().dict(**kwargs), kwargs.get("exclude_none", False))
+
     def yaml(self, stream: Union[TextIO, Path]):
-        # Passing through self.json() allows json_encoders
-        # to serialize objects and the _cleandict hook avoids
-        # writing empty keys to the yaml file.
-        encoded = json.loads(self.json(), object_hook=_cleandict)
-        return yaml.dump(encoded, stream)
+        return get_yaml().dump(self.dict(exclude_none=True), stream)
 
     @classmethod
     def parse_yaml(cls, fn: Union[str, Path]):
-        d = yaml.load(fn)
+        if not isinstance(fn, Path):
+            return cls._from_yaml(fn, fn)
+
+        # A deep copy is returned so that callers cannot modify the cached model.
+        stat = fn.stat()
+        model = _parse_file(cls, os.path.abspath(fn), stat.st_mtime_ns, stat.st_size)
+        return model.copy(deep=True)
+
+    @classmethod
+    def _from_yaml(
+        cls, stream: Union[str, TextIO, BinaryIO], fn: Union[str, Path]
+    ) -> "BaseYaml":
+        # Files are only read here, never written back, so the safe loader
+        # is used rather than the round-trip loader.
+        d = get_safe_yaml().load(stream)
         if d is None:
             msg = (
                 f"Failed to read {fn} as {cls.__name__}. The file appears to be empty."
@@ -46,13 +141,12 @@ class BaseYaml(BaseModel):
             raise CondaProjectError(msg)
 
     class Config:
-        json_encoders = {Path: lambda v: v.as_posix()}
         extra = "forbid"
 
 
 class CondaProjectYaml(BaseYaml):
     name: str
-    environments: OrderedDict[str, List[Path]]
+    environments: Dict[str, List[Path]]
 
 
 class EnvironmentYaml(BaseYaml):
@@ -63,12 +157,11 @@ class EnvironmentYaml(BaseYaml):
     prefix: Optional[Path] = None
     platforms: Optional[List[str]] = None
 
-    @validator("dependencies")
+    @validator("dependencies", allow_reuse=True)
     def only_pip_key_allowed(cls, v):
         for item in v:
-            if isinstance(item, dict):
-                if not item.keys() == {"pip"}:
-                    raise ValueError(
-                        f'The dependencies key contains an invalid map {item}. Only "pip:" is allowed.'
-                    )
+            if type(item) is dict and (len(item) != 1 or "pip" not in item):
+                raise ValueError(
+                    f'The dependencies key contains an invalid map {item}. Only "pip:" is allowed.'
+                )
         return v
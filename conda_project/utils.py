@@ -10,10 +10,15 @@ from collections.abc import Generator
 from contextlib import contextmanager
 from inspect import Traceback
 from pathlib import Path
-from typing import Optional, Type
+from typing import Optional, Set, Type
 
 from .exceptions import CondaProjectError
 
+try:
+    from orjson import loads as json_loads  # noqa: F401
+except ImportError:
+    from json import loads as json_loads  # type: ignore # noqa: F401
+
 
 @contextmanager
 def env_variable(key: str, value: str) -> Generator:
@@ -78,9 +83,32 @@ class Spinner:
         self.stop()
 
 
-def find_file(directory: Path, options: tuple) -> Optional[Path]:
+def list_files(directory: Path) -> Set[str]:
+    """List the names of the files in a directory with a single scan.
+
+    Returns:
+        The set of file names, which is empty if the directory does not exist
+        or is not a directory
+
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
+def find_file(
+    directory: Path, options: tuple, filenames: Optional[Set[str]] = None
+) -> Optional[Path]:
     """Search for a file in a directory from a tuple of variants.
 
+    Args:
+        directory: The directory to search
+        options: The file names to look for
+        filenames: The names of the files in the directory as returned by
+                   list_files. The directory is scanned if not provided.
+
     Returns:
         The path to the file if found else None
 
@@ -88,12 +116,18 @@ def find_file(directory: Path, options: tuple) -> Optional[Path]:
         CondaProjectError if more than one of the options is found
 
     """
-    found = []
-
-    for filename in options:
-        path = directory / filename
-        if path.exists():
-            found.append(path.resolve())
+    if filenames is None:
+        filenames = list_files(directory)
+
+    # On case-insensitive file systems a file listed as Environment.yml is
+    # still found as environment.yml, so names that only differ in case
+    # are checked on disk.
+    lowered = {fn.lower() for fn in filenames}
+    found = [
+        (directory / fn).resolve()
+        for fn in options
+        if fn in filenames or (fn.lower() in lowered and (directory / fn).is_file())
+    ]
 
     if len(found) == 1:
         return found[0]
@@ -8,7 +8,12 @@ import versioneer
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
-requirements = ["conda-lock>=1", "ruamel.yaml", "pydantic"]
+requirements = [
+    "conda-lock>=1",
+    "ruamel.yaml",
+    "ruamel.yaml.clib",
+    "pydantic",
+]
 
 setup(
     name="conda-project",
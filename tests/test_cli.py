@@ -5,8 +5,10 @@ from functools import partial
 from textwrap import dedent
 
 import pytest
+from ruamel.yaml import YAML
 
 from conda_project.cli.main import cli, main, parse_and_run
+from conda_project.project import default_platforms
 
 PROJECT_COMMANDS = ("create", "check")
 ENVIRONMENT_COMMANDS = ("clean", "prepare", "lock")
@@ -105,6 +107,16 @@ def test_create_with_prepare(tmp_path):
     assert (tmp_path / "envs" / "default" / "conda-meta" / "history").exists()
 
 
+def test_create_default_platforms(tmp_path):
+    ret = parse_and_run(["create", "--directory", str(tmp_path), "--no-lock"])
+    assert ret == 0
+
+    with (tmp_path / "environment.yml").open() as f:
+        env = YAML().load(f)
+
+    assert env["platforms"] == list(default_platforms())
+
+
 @pytest.mark.parametrize("command", ENVIRONMENT_COMMANDS)
 def test_command_with_environment_name(command, monkeypatch, project_directory_factory):
     env1 = env2 = "dependencies: []\n"
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 # Copyright (C) 2022 Anaconda, Inc
 # SPDX-License-Identifier: BSD-3-Clause
+import json
+
 import pytest
 
-from conda_project.conda import call_conda, conda_info, current_platform
+from conda_project.conda import (
+    call_conda,
+    conda_info,
+    current_platform,
+    installed_package_urls,
+)
 from conda_project.exceptions import CondaProjectError
 
 
@@ -43,7 +50,36 @@ def test_conda_info():
     assert "conda_version" in info
 
 
+def test_conda_info_cached():
+    assert conda_info() is conda_info()
+
+
 def test_current_platform(monkeypatch):
     monkeypatch.setenv("CONDA_SUBDIR", "monkey-64")
-    platform = current_platform()
+    conda_info.cache_clear()
+    try:
+        platform = current_platform()
+    finally:
+        conda_info.cache_clear()
     assert platform == "monkey-64"
+
+
+def test_installed_package_urls(tmp_path):
+    conda_meta = tmp_path / "conda-meta"
+    conda_meta.mkdir()
+
+    records = {
+        "a-1-0.json": {"url": "https://repo/linux-64/a-1-0.tar.bz2"},
+        "b-1-0.json": {"url": "https://repo/noarch/b-1-0.conda"},
+        "c-1-0.json": {"url": "<unknown>/c-1-0.tar.bz2"},
+        "d-1-0.json": {},
+    }
+    for fn, record in records.items():
+        with (conda_meta / fn).open("wt") as f:
+            json.dump(record, f)
+    (conda_meta / "history").touch()
+
+    assert sorted(installed_package_urls(tmp_path)) == [
+        "https://repo/linux-64/a-1-0.tar.bz2",
+        "https://repo/noarch/b-1-0.conda",
+    ]
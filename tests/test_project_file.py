@@ -7,6 +7,7 @@ from textwrap import dedent
 from typing import Dict, List, Optional, Union
 
 import pytest
+from ruamel.yaml.constructor import DuplicateKeyError
 
 from conda_project.exceptions import CondaProjectError
 from conda_project.project_file import BaseYaml, CondaProjectYaml, EnvironmentYaml
@@ -30,6 +31,14 @@ def test_unsupported_key_in_dependencies():
         _ = EnvironmentYaml(**env_dict)
 
 
+def test_pip_key_in_dependencies():
+    env = EnvironmentYaml(dependencies=["python", "pip", {"pip": ["requests"]}])
+    assert env.dependencies[2] == {"pip": ["requests"]}
+
+    with pytest.raises(ValueError):
+        _ = EnvironmentYaml(dependencies=[{"pip": ["requests"], "npm": ["foo"]}])
+
+
 def test_to_yaml_with_indent():
     class Yaml(BaseYaml):
         foo: str
@@ -65,6 +74,36 @@ def test_bad_yaml_file():
     assert "validation error for YamlFile" in str(exinfo.value)
 
 
+def test_variables_yaml_1_2_scalars():
+    environment_yaml = dedent(
+        """\
+        dependencies: []
+        variables:
+          DEBUG: yes
+          LEVEL: on
+        """
+    )
+
+    env = EnvironmentYaml.parse_yaml(environment_yaml)
+    assert env.variables == {"DEBUG": "yes", "LEVEL": "on"}
+
+    stream = StringIO()
+    env.yaml(stream)
+    assert EnvironmentYaml.parse_yaml(stream.getvalue()).variables == env.variables
+
+
+def test_duplicate_keys_yaml_file():
+    environment_yaml = dedent(
+        """\
+        dependencies: [python]
+        dependencies: [numpy]
+        """
+    )
+
+    with pytest.raises(DuplicateKeyError):
+        _ = EnvironmentYaml.parse_yaml(environment_yaml)
+
+
 def test_miss_spelled_env_yaml_file():
     environment_yaml = dedent(
         """\
@@ -102,6 +141,13 @@ def test_project_file_with_one_env():
     assert project_file.environments["default"] == [Path("./environment.yml")]
 
 
+def test_dict_paths_as_posix_strings():
+    env = EnvironmentYaml(prefix=Path("envs") / "default")
+
+    assert env.dict()["prefix"] == "envs/default"
+    assert "prefix" not in EnvironmentYaml().dict(exclude_none=True)
+
+
 def test_project_yaml_round_trip():
     project_file_input = dedent(
         """\
@@ -136,3 +182,32 @@ def test_project_yaml_round_trip():
     )
 
     assert written_contents == expected_contents
+
+
+def test_parse_yaml_file_cached(tmp_path):
+    env_file = tmp_path / "environment.yml"
+    env_file.write_text("channels: [defaults]\ndependencies: []\n")
+
+    first = EnvironmentYaml.parse_yaml(env_file)
+    second = EnvironmentYaml.parse_yaml(env_file)
+    assert first == second
+    assert first is not second
+
+    first.channels.append("conda-forge")
+    assert EnvironmentYaml.parse_yaml(env_file).channels == ["defaults"]
+
+    env_file.write_text("channels: [conda-forge]\ndependencies: []\n")
+    assert EnvironmentYaml.parse_yaml(env_file).channels == ["conda-forge"]
+
+
+def test_parse_yaml_file_utf8(tmp_path):
+    env_file = tmp_path / "environment.yml"
+    env_file.write_bytes("name: José\ndependencies: []\n".encode("utf-8"))
+
+    assert EnvironmentYaml.parse_yaml(env_file).name == "José"
+
+
+def test_module_yaml_writer():
+    from conda_project.project_file import get_yaml, yaml
+
+    assert yaml is get_yaml()
@@ -6,7 +6,7 @@ import os
 import pytest
 
 from conda_project.exceptions import CondaProjectError
-from conda_project.utils import env_variable, find_file
+from conda_project.utils import env_variable, find_file, list_files
 
 
 def test_env_var_context():
@@ -42,3 +42,32 @@ def test_find_file(tmp_path):
 
     with pytest.raises(CondaProjectError):
         find_file(tmp_path, ("file.yaml", "file.yml"))
+
+
+def test_list_files(tmp_path):
+    (tmp_path / "file.yml").touch()
+    (tmp_path / "subdir").mkdir()
+
+    assert list_files(tmp_path) == {"file.yml"}
+    assert list_files(tmp_path / "missing") == set()
+    assert list_files(tmp_path / "file.yml") == set()
+
+
+def test_find_file_from_listing(tmp_path):
+    yml = tmp_path / "file.yml"
+    yml.touch()
+
+    filenames = list_files(tmp_path)
+    assert find_file(tmp_path, ("file.yml",), filenames) == yml.resolve()
+    assert find_file(tmp_path, ("file.yaml",), filenames) is None
+
+
+def test_find_file_case_only_differs(tmp_path):
+    (tmp_path / "File.yml").touch()
+
+    filenames = list_files(tmp_path)
+    found = find_file(tmp_path, ("file.yml",), filenames)
+    if (tmp_path / "file.yml").exists():
+        assert found is not None
+    else:
+        assert found is None